@@ -1,23 +1,62 @@
+from functools import lru_cache
+
 import streamlit as st
-import pandas as pd
-import altair as alt
+import numpy as np
 
 ###############################################################################
 # 1. Helper Functions
 ###############################################################################
-def with_monthly_and_annual_labels(data_dict):
+@lru_cache(maxsize=None)
+def with_monthly_and_annual_labels(items):
     """
-    Takes a dict { 'Label': annual_cost, ... }
+    Takes a tuple of (label, annual_cost) pairs, e.g. tuple(raw_dict.items())
     Returns a dict where each key includes monthly & annual cost:
       e.g. "Rent an Apartment ($1,000/mo, $12,000/yr)"
+    Memoized on the (hashable) items for the current script run, so treat the
+    dict as read-only; get_all_data() is what caches the labels across reruns.
+    Costs are whole dollars, so the monthly figure is rounded with integer
+    math ((annual + 6) // 12) instead of a float division; an exact half
+    dollar rounds up.
+    """
+    return {
+        f"{name} (${(annual_cost + 6) // 12:,.0f}/mo, ${annual_cost:,.0f}/yr)": annual_cost
+        for name, annual_cost in items
+    }
+
+@lru_cache(maxsize=None)
+def with_label_lookup(items):
+    """
+    Takes a tuple of (label, (annual_cost, extra)) pairs for dicts that store
+    more than one value per option (housing, vehicle).
+    Returns a dict mapping the monthly & annual labeled key back to the raw
+    label, so the caller can look up the full tuple:
+      e.g. "Rent an Apartment ($1,000/mo, $12,000/yr)" -> "Rent an Apartment"
+    Memoized like with_monthly_and_annual_labels.
+    """
+    return {
+        f"{label} (${(annual_cost + 6) // 12:,.0f}/mo, ${annual_cost:,.0f}/yr)": label
+        for label, (annual_cost, _) in items
+    }
+
+# Tax brackets as arrays: where each bracket starts and its rate, plus the
+# tax already owed at the start of each bracket (0 / 2,000 / 8,000 / 20,000).
+# The tax on any income is then one lookup + one multiply-add.
+_LOWERS = np.array([0.0, 20000.0, 60000.0, 120000.0])
+_RATES = np.array([0.10, 0.15, 0.20, 0.25])
+_CUM_TAX = np.concatenate(([0.0], np.cumsum(np.diff(_LOWERS) * _RATES[:-1])))
+
+def compute_taxes_vec(incomes):
+    """
+    Array version of compute_taxes, for scanning many salaries at once
+    (e.g. a sensitivity chart). Accepts a scalar or an array of incomes and
+    returns the tax for each: np.searchsorted finds every income's bracket,
+    so the whole array is handled in C with no Python loop.
     """
-    updated = {}
-    for name, annual_cost in data_dict.items():
-        monthly_cost = annual_cost / 12
-        updated_key = f"{name} (${monthly_cost:,.0f}/mo, ${annual_cost:,.0f}/yr)"
-        updated[updated_key] = annual_cost
-    return updated
+    x = np.maximum(np.asarray(incomes, dtype=np.float64), 0.0)
+    idx = np.searchsorted(_LOWERS[1:], x, side="right")
+    return _CUM_TAX[idx] + (x - _LOWERS[idx]) * _RATES[idx]
 
+@lru_cache(maxsize=16)
 def compute_taxes(income):
     """
     Simplified tiered tax function (not real tax law!):
@@ -25,57 +64,397 @@ def compute_taxes(income):
       - 15% for next $40k (20k - 60k)
       - 20% for next $60k (60k - 120k)
       - 25% above 120k
+    Memoized within a script run; compute_breakdown caches the result across
+    reruns.
     """
-    if income <= 0:
-        return 0
-
-    tax = 0.0
-    remaining = income
-
-    # Bracket 1: Up to 20k at 10%
-    bracket1_limit = 20000
-    bracket1_rate = 0.10
-    if remaining > bracket1_limit:
-        tax += bracket1_limit * bracket1_rate
-        remaining -= bracket1_limit
+    return float(compute_taxes_vec(income))
+
+# Waterfall steps, in bar order. The amounts passed to build_waterfall_rows
+# line up with these one-to-one.
+_CATEGORIES = (
+    "Starting Salary",
+    "Taxes",
+    "Housing",
+    "Home Insurance",
+    "Vehicle Payment",
+    "Gas",
+    "Groceries",
+    "Medical Insurance",
+    "Childcare",
+    "Phone Plan",
+    "Utilities",
+    "College Loan",
+    "Entertainment",
+    "Retirement",
+    "Discretionary Income",
+)
+_CATEGORY_ARRAY = np.array(_CATEGORIES)
+
+# Bar colors: salary is green, every expense red. Only the final
+# "Discretionary Income" bar depends on the scenario (blue, or red if < 0).
+_BASE_COLORS = np.where(_CATEGORY_ARRAY == "Starting Salary", "green", "red")
+
+def _waterfall_arrays(amounts):
+    """
+    Given a float64 array of step amounts, returns (start, cumulative),
+    i.e. where each waterfall bar starts and ends. One cumsum pass; each
+    bar starts where the previous one ended.
+    """
+    cumulative = np.cumsum(amounts)
+    start = np.empty_like(cumulative)
+    start[0] = 0.0
+    start[1:] = cumulative[:-1]
+    return start, cumulative
+
+# Hand-written Vega-Lite spec for the waterfall (bars + value labels). The
+# layout never changes, so there's no need to build it through Altair; only
+# the rows are built per scenario by build_waterfall_rows. Every position is
+# precomputed, so there are no transforms, and the category order is given
+# explicitly so Vega-Lite doesn't have to sort.
+_WATERFALL_SPEC = {
+    "$schema": "https://vega.github.io/schema/vega-lite/v5.json",
+    "width": 800,
+    "height": 400,
+    "layer": [
+        {
+            "mark": {"type": "bar"},
+            "encoding": {
+                "x": {"field": "Category", "type": "ordinal", "sort": list(_CATEGORIES), "title": ""},
+                "y": {"field": "Start", "type": "quantitative", "title": "Annual Amount (USD)"},
+                "y2": {"field": "End"},
+                "color": {"field": "Color", "type": "nominal", "scale": None},
+                "tooltip": [
+                    {"field": "Category",   "type": "nominal",      "title": "Category"},
+                    {"field": "Amount",     "type": "quantitative", "title": "Step Amount", "format": ",.0f"},
+                    {"field": "End",        "type": "quantitative", "title": "Cumulative",  "format": ",.0f"}
+                ]
+            }
+        },
+        {
+            "mark": {"type": "text", "dy": -5, "color": "black", "fontWeight": "bold"},
+            "encoding": {
+                "x": {"field": "Category", "type": "ordinal", "sort": list(_CATEGORIES)},
+                "y": {"field": "End", "type": "quantitative"},
+                "text": {"field": "Label", "type": "quantitative", "format": ",.0f"}
+            }
+        }
+    ]
+}
+
+def build_waterfall_rows(amounts, discretionary_income):
+    """
+    Builds the waterfall chart's data rows from the tuple of step amounts,
+    one per _CATEGORIES entry (salary first, then each expense as a
+    negative, then 0 for the final "Discretionary Income" bar).
+    main() only calls this when those inputs change; the chart structure is
+    the shared, static _WATERFALL_SPEC and is never rebuilt or copied here.
+    """
+    amount_values = np.array(amounts, dtype=np.float64)
+
+    # Drop zero-cost steps (e.g. "No Loans", no childcare) so the chart only
+    # draws bars that move the total; salary & the final bar always stay.
+    keep = amount_values != 0
+    keep[0] = keep[-1] = True
+    amount_values = amount_values[keep]
+    categories = _CATEGORY_ARRAY[keep]
+
+    start, cumulative = _waterfall_arrays(amount_values)
+
+    # Custom label that shows the leftover on the final bar (always the last
+    # step), and bar colors: whole-array copies plus one slot each, instead
+    # of a per-row Python callback.
+    label_values = cumulative.copy()
+    label_values[-1] = discretionary_income
+
+    colors = _BASE_COLORS[keep]
+    colors[-1] = "blue" if discretionary_income >= 0 else "red"
+
+    # Only the fields the marks & tooltips read; End doubles as the
+    # cumulative total, so it isn't sent twice.
+    records = [
+        {"Category": c, "Amount": a, "Start": s0, "End": cu, "Label": lab, "Color": col}
+        for c, a, cu, s0, lab, col in zip(
+            categories.tolist(), amount_values.tolist(), cumulative.tolist(), start.tolist(),
+            label_values.tolist(), colors.tolist()
+        )
+    ]
+
+    return records
+
+###############################################################################
+# 2. RAW DATA DICTS (WITHOUT monthly/annual labels yet)
+###############################################################################
+# Module-level constants: main() and the helpers below only read them.
+
+# Family status options; groceries, medical & childcare depend on this choice.
+_FAMILY_STATUSES = ("Single", "Family with kids")
+
+# 2.1 Career Data
+_CAREER_RAW = {
+    "Software Engineer": 90000,
+    "Teacher": 45000,
+    "Data Scientist": 100000,
+    "Nurse": 65000,
+    "Accountant": 55000,
+    "Marketing Specialist": 60000
+}
+
+# 2.2 Housing (plus associated mandatory home insurance)
+_HOUSING_RAW = {
+    # We'll store (annual_rent_or_mortgage, annual_home_insurance)
+    "Rent an Apartment": (12000, 150),    # renters insurance
+    "Buy a Cheap House": (18000, 600),    # homeowners insurance
+    "Buy a Nice House": (30000, 1000)     # homeowners insurance
+}
+
+# 2.3 Vehicle
+# For each vehicle, define (annual_payment, mpg_estimate) 
+# so we can compute gas cost separately.
+_VEHICLE_RAW = {
+    "No Car (Public Transport)": (1000, 0),   # no mpg => no gas cost
+    "Used Economy Car": (3000, 30),
+    "New Economy Car": (5000, 28),
+    "SUV": (7000, 20),
+    "Luxury Car": (10000, 18)
+}
+
+# 2.4 Groceries
+# Single vs. Family: we define different annual costs
+_GROCERIES_RAW = {
+    "Single": {
+        "Minimal Groceries": 2400,
+        "Basic Groceries": 3600,
+        "Premium Groceries": 6000
+    },
+    "Family with kids": {
+        "Minimal Groceries": 3600,   # e.g., +$1,200 for kids
+        "Basic Groceries": 5400,
+        "Premium Groceries": 9000
+    }
+}
+
+# 2.5 Medical Insurance 
+# Single vs. Family rates
+_MEDICAL_RAW = {
+    "Single": {
+        "Free": 0,
+        "Basic": 2000,
+        "Premium": 5000
+    },
+    "Family with kids": {
+        "Free": 0,
+        "Basic": 3500,   # e.g., +$1,500 for kids
+        "Premium": 7000
+    }
+}
+
+# 2.6 Phone Plan
+_PHONE_RAW = {
+    "Basic Phone Plan": 300,
+    "Standard Phone Plan": 600,
+    "Unlimited Premium": 1200
+}
+
+# 2.7 Utilities
+_UTILITIES_RAW = {
+    "Low Utilities": 1800,
+    "Medium Utilities": 3000,
+    "High Utilities": 4800
+}
+
+# 2.8 Loan (College Loan)
+_LOAN_RAW = {
+    "No Loans": 0,
+    "Low Repayment": 3000,
+    "Medium Repayment": 6000,
+    "High Repayment": 12000
+}
+
+# 2.9 Entertainment
+_ENTERTAINMENT_RAW = {
+    "No Subscriptions": 0,
+    "Basic Streaming & Activities": 600,
+    "Moderate Entertainment": 1500,
+    "High Entertainment": 3000
+}
+
+# 2.10 Retirement
+_RETIREMENT_DATA = {
+    "None (0%)": 0.00,
+    "5% of Salary": 0.05,
+    "10% of Salary": 0.10,
+    "15% of Salary": 0.15,
+    "20% of Salary": 0.20
+}
+
+# 2.11 Childcare (Optional: Show only if family with kids)
+# You can treat this as a separate cost or embed it in groceries, etc.
+_CHILDCARE_RAW = {
+    "No Childcare": 0,
+    "Minimal Daycare": 3000,
+    "Premium Daycare": 6000
+}
+
+@st.cache_resource(show_spinner=False)
+def get_all_data(family_status):
+    """
+    Returns every option dict main() shows, keyed by section name, with the
+    monthly & annual labels already applied. Groceries, medical and childcare
+    depend on family status; everything else is shared.
+    Housing & vehicle map the labeled key back to the raw key (their raw dicts
+    hold 2 values per option); _RETIREMENT_DATA is % so it has no labels.
+    Cached per family status with st.cache_resource, so every rerun (and
+    session) gets the same shared dicts back without unpickling; treat them
+    as read-only.
+    """
+    if family_status == "Family with kids":
+        childcare_data = with_monthly_and_annual_labels(tuple(_CHILDCARE_RAW.items()))
     else:
-        tax += remaining * bracket1_rate
-        remaining = 0
-
-    if remaining <= 0:
-        return tax
-
-    # Bracket 2: 20k to 60k at 15%
-    bracket2_limit = 40000
-    bracket2_rate = 0.15
-    if remaining > bracket2_limit:
-        tax += bracket2_limit * bracket2_rate
-        remaining -= bracket2_limit
+        childcare_data = {"No Childcare (N/A)": 0}  # single folk won't see a real cost
+
+    return {
+        "career": with_monthly_and_annual_labels(tuple(_CAREER_RAW.items())),
+        "housing": with_label_lookup(tuple(_HOUSING_RAW.items())),
+        "vehicle": with_label_lookup(tuple(_VEHICLE_RAW.items())),
+        "groceries": with_monthly_and_annual_labels(tuple(_GROCERIES_RAW[family_status].items())),
+        "medical": with_monthly_and_annual_labels(tuple(_MEDICAL_RAW[family_status].items())),
+        "childcare": childcare_data,
+        "phone": with_monthly_and_annual_labels(tuple(_PHONE_RAW.items())),
+        "utilities": with_monthly_and_annual_labels(tuple(_UTILITIES_RAW.items())),
+        "loan": with_monthly_and_annual_labels(tuple(_LOAN_RAW.items())),
+        "entertainment": with_monthly_and_annual_labels(tuple(_ENTERTAINMENT_RAW.items())),
+        "retirement": _RETIREMENT_DATA,
+    }
+
+@st.cache_data(show_spinner=False)
+def get_option_keys(family_status):
+    """
+    Returns the selectbox options for each section of get_all_data(), as
+    tuples cached per family status rather than a fresh list per rerun.
+    """
+    return {name: tuple(d.keys()) for name, d in get_all_data(family_status).items()}
+
+@st.cache_data(show_spinner=False)
+def compute_breakdown(family_status, selected_career, selected_housing,
+                      selected_vehicle, annual_miles, gas_price,
+                      selected_groceries, selected_medical, selected_childcare,
+                      selected_phone, selected_utilities, selected_loan,
+                      selected_entertainment, selected_retirement):
+    """
+    Takes the user's selections (the labeled option keys shown in main(),
+    plus the driving inputs) and returns a dict with every annual cost,
+    taxes, discretionary income and the waterfall step amounts, along with
+    the selections themselves for the summary.
+    Cached on the selections, so re-submitting a scenario is a lookup.
+    """
+    data = get_all_data(family_status)
+
+    annual_salary = data["career"][selected_career]
+
+    # fetch the raw key
+    housing_key = data["housing"][selected_housing]
+    annual_housing_cost = _HOUSING_RAW[housing_key][0]   # first element
+    annual_home_insurance = _HOUSING_RAW[housing_key][1] # second element
+
+    vehicle_key = data["vehicle"][selected_vehicle]
+    annual_vehicle_payment = _VEHICLE_RAW[vehicle_key][0]
+    vehicle_mpg = _VEHICLE_RAW[vehicle_key][1]
+
+    # Compute gas cost if user has a real vehicle (No Car has mpg 0, and
+    # main() passes 0 miles for it => no gas cost)
+    if vehicle_mpg > 0:
+        gallons_per_year = annual_miles / vehicle_mpg
+        annual_gas_cost = gallons_per_year * gas_price
     else:
-        tax += remaining * bracket2_rate
-        remaining = 0
-
-    if remaining <= 0:
-        return tax
-
-    # Bracket 3: 60k to 120k at 20%
-    bracket3_limit = 60000
-    bracket3_rate = 0.20
-    if remaining > bracket3_limit:
-        tax += bracket3_limit * bracket3_rate
-        remaining -= bracket3_limit
+        annual_gas_cost = 0
+
+    annual_groceries_cost = data["groceries"][selected_groceries]
+    annual_medical_cost = data["medical"][selected_medical]
+
+    # If family => childcare
+    if family_status == "Family with kids":
+        annual_childcare_cost = data["childcare"][selected_childcare]
     else:
-        tax += remaining * bracket3_rate
-        remaining = 0
+        annual_childcare_cost = 0
+
+    annual_phone_cost = data["phone"][selected_phone]
+    annual_utilities_cost = data["utilities"][selected_utilities]
+    annual_loan_cost = data["loan"][selected_loan]
+    annual_entertainment_cost = data["entertainment"][selected_entertainment]
+
+    retirement_fraction = data["retirement"][selected_retirement]
+    annual_retirement_cost = annual_salary * retirement_fraction
+
+    tax_amount = compute_taxes(annual_salary)
 
-    if remaining <= 0:
-        return tax
+    # Sum up all expenses
+    total_expenses = (
+        annual_housing_cost +
+        annual_home_insurance +  # mandatory home/renters insurance
+        annual_vehicle_payment +
+        annual_gas_cost +
+        annual_groceries_cost +
+        annual_medical_cost +
+        annual_childcare_cost +  # only > 0 if family
+        annual_phone_cost +
+        annual_utilities_cost +
+        annual_loan_cost +
+        annual_entertainment_cost +
+        annual_retirement_cost
+    )
 
-    # Bracket 4: Above 120k at 25%
-    bracket4_rate = 0.25
-    tax += remaining * bracket4_rate
+    discretionary_income = annual_salary - tax_amount - total_expenses
 
-    return tax
+    return {
+        "family_status": family_status,
+        "selected_career": selected_career,
+        "annual_salary": annual_salary,
+        "tax_amount": tax_amount,
+        "selected_housing": selected_housing,
+        "annual_housing_cost": annual_housing_cost,
+        "annual_home_insurance": annual_home_insurance,
+        "selected_vehicle": selected_vehicle,
+        "vehicle_key": vehicle_key,
+        "annual_vehicle_payment": annual_vehicle_payment,
+        "annual_miles": annual_miles,
+        "vehicle_mpg": vehicle_mpg,
+        "annual_gas_cost": annual_gas_cost,
+        "selected_groceries": selected_groceries,
+        "annual_groceries_cost": annual_groceries_cost,
+        "selected_medical": selected_medical,
+        "annual_medical_cost": annual_medical_cost,
+        "annual_childcare_cost": annual_childcare_cost,
+        "selected_phone": selected_phone,
+        "annual_phone_cost": annual_phone_cost,
+        "selected_utilities": selected_utilities,
+        "annual_utilities_cost": annual_utilities_cost,
+        "selected_loan": selected_loan,
+        "annual_loan_cost": annual_loan_cost,
+        "selected_entertainment": selected_entertainment,
+        "annual_entertainment_cost": annual_entertainment_cost,
+        "selected_retirement": selected_retirement,
+        "annual_retirement_cost": annual_retirement_cost,
+        "discretionary_income": discretionary_income,
+        # Waterfall steps: we'll give the final "Discretionary Income"
+        # step an Amount=0, but label the bar with the leftover.
+        "amounts": (
+            annual_salary,
+            -tax_amount,
+            -annual_housing_cost,
+            -annual_home_insurance,
+            -annual_vehicle_payment,
+            -annual_gas_cost,
+            -annual_groceries_cost,
+            -annual_medical_cost,
+            -annual_childcare_cost,
+            -annual_phone_cost,
+            -annual_utilities_cost,
+            -annual_loan_cost,
+            -annual_entertainment_cost,
+            -annual_retirement_cost,
+            0,
+        ),
+    }
 
 def main():
     st.title("Financial Decisions App with Family Toggle & Monthly Costs")
@@ -85,278 +464,140 @@ def main():
     """)
 
     ############################################################################
-    # 2. FAMILY STATUS SELECTION
+    # 3. FAMILY STATUS SELECTION
     ############################################################################
     family_status = st.selectbox(
         "Select Your Family Status:",
-        ["Single", "Family with kids"]
+        _FAMILY_STATUSES,
+        key="family_status"
     )
 
     # This choice will affect groceries cost, medical cost, etc.
 
-    ############################################################################
-    # 3. DEFINE RAW DATA DICTS (WITHOUT monthly/annual labels yet)
-    ############################################################################
-    # 3.1 Career Data
-    career_data_raw = {
-        "Software Engineer": 90000,
-        "Teacher": 45000,
-        "Data Scientist": 100000,
-        "Nurse": 65000,
-        "Accountant": 55000,
-        "Marketing Specialist": 60000
-    }
-
-    # 3.2 Housing (plus associated mandatory home insurance)
-    housing_data_raw = {
-        # We'll store (annual_rent_or_mortgage, annual_home_insurance)
-        "Rent an Apartment": (12000, 150),    # renters insurance
-        "Buy a Cheap House": (18000, 600),    # homeowners insurance
-        "Buy a Nice House": (30000, 1000)     # homeowners insurance
-    }
-
-    # 3.3 Vehicle
-    # For each vehicle, define (annual_payment, mpg_estimate) 
-    # so we can compute gas cost separately.
-    vehicle_data_raw = {
-        "No Car (Public Transport)": (1000, 0),   # no mpg => no gas cost
-        "Used Economy Car": (3000, 30),
-        "New Economy Car": (5000, 28),
-        "SUV": (7000, 20),
-        "Luxury Car": (10000, 18)
-    }
-
-    # 3.4 Groceries
-    # Single vs. Family: we define different annual costs
-    if family_status == "Single":
-        groceries_dict_raw = {
-            "Minimal Groceries": 2400,
-            "Basic Groceries": 3600,
-            "Premium Groceries": 6000
-        }
-    else:  # Family with kids
-        groceries_dict_raw = {
-            "Minimal Groceries": 3600,   # e.g., +$1,200 for kids
-            "Basic Groceries": 5400,
-            "Premium Groceries": 9000
-        }
-
-    # 3.5 Medical Insurance 
-    # Single vs. Family rates
-    if family_status == "Single":
-        medical_data_raw = {
-            "Free": 0,
-            "Basic": 2000,
-            "Premium": 5000
-        }
-    else:
-        medical_data_raw = {
-            "Free": 0,
-            "Basic": 3500,   # e.g., +$1,500 for kids
-            "Premium": 7000
-        }
-
-    # 3.6 Phone Plan
-    phone_data_raw = {
-        "Basic Phone Plan": 300,
-        "Standard Phone Plan": 600,
-        "Unlimited Premium": 1200
-    }
-
-    # 3.7 Utilities
-    utilities_data_raw = {
-        "Low Utilities": 1800,
-        "Medium Utilities": 3000,
-        "High Utilities": 4800
-    }
-
-    # 3.8 Loan (College Loan)
-    loan_data_raw = {
-        "No Loans": 0,
-        "Low Repayment": 3000,
-        "Medium Repayment": 6000,
-        "High Repayment": 12000
-    }
-
-    # 3.9 Entertainment
-    entertainment_data_raw = {
-        "No Subscriptions": 0,
-        "Basic Streaming & Activities": 600,
-        "Moderate Entertainment": 1500,
-        "High Entertainment": 3000
-    }
-
-    # 3.10 Retirement
-    retirement_data = {
-        "None (0%)": 0.00,
-        "5% of Salary": 0.05,
-        "10% of Salary": 0.10,
-        "15% of Salary": 0.15,
-        "20% of Salary": 0.20
-    }
-
-    # 3.11 Childcare (Optional: Show only if family with kids)
-    # You can treat this as a separate cost or embed it in groceries, etc.
-    childcare_data_raw = {
-        "No Childcare": 0,
-        "Minimal Daycare": 3000,
-        "Premium Daycare": 6000
-    }
-
     ############################################################################
     # 4. Convert to monthly+annual labels (where applicable)
     ############################################################################
-    # For housing, we have 2 values per option => must handle carefully:
-    # We'll only label the main rent/mortgage cost; insurance is hidden from user.
-    housing_labeled = {}
-    for label, (annual_housing, _) in housing_data_raw.items():
-        monthly_cost = annual_housing / 12
-        new_key = f"{label} (${monthly_cost:,.0f}/mo, ${annual_housing:,.0f}/yr)"
-        housing_labeled[new_key] = label  # store the 'label' so we can look up real cost
-
-    # For vehicle, we have (annual_payment, mpg)
-    vehicle_labeled = {}
-    for label, (annual_payment, mpg) in vehicle_data_raw.items():
-        monthly_cost = annual_payment / 12
-        new_key = f"{label} (${monthly_cost:,.0f}/mo, ${annual_payment:,.0f}/yr)"
-        vehicle_labeled[new_key] = label
-
-    # Standard use of with_monthly_and_annual_labels for single-value dicts
-    career_data = with_monthly_and_annual_labels(career_data_raw)
-    groceries_data = with_monthly_and_annual_labels(groceries_dict_raw)
-    medical_data = with_monthly_and_annual_labels(medical_data_raw)
-    phone_data = with_monthly_and_annual_labels(phone_data_raw)
-    utilities_data = with_monthly_and_annual_labels(utilities_data_raw)
-    loan_data = with_monthly_and_annual_labels(loan_data_raw)
-    entertainment_data = with_monthly_and_annual_labels(entertainment_data_raw)
-    # retirement_data is % - no monthly/annual label function 
-    # childcare (only if family)
-    if family_status == "Family with kids":
-        childcare_data = with_monthly_and_annual_labels(childcare_data_raw)
-    else:
-        childcare_data = {"No Childcare (N/A)": 0}  # single folk won't see a real cost
+    # Cached calls return every labeled dict (and its option keys) for this
+    # family status.
+    data = get_all_data(family_status)
+    options = get_option_keys(family_status)
 
     ############################################################################
     # 5. User Selections
     ############################################################################
-    st.subheader("Select Your Career")
-    selected_career = st.selectbox("Career Path:", list(career_data.keys()))
-    annual_salary = career_data[selected_career]
-
-    st.subheader("Select Your Housing")
-    selected_housing = st.selectbox("Housing Option:", list(housing_labeled.keys()))
-    # fetch the raw key
-    housing_key = housing_labeled[selected_housing]
-    annual_housing_cost = housing_data_raw[housing_key][0]   # first element
-    annual_home_insurance = housing_data_raw[housing_key][1] # second element
-
+    # Batched in a form: changing a selectbox doesn't rerun the app until the
+    # user presses "Calculate". Family status and vehicle stay outside the
+    # form since they decide which sections are shown (childcare, driving).
+    # Every widget has a stable key so its value survives reruns.
     st.subheader("Select Your Vehicle")
-    selected_vehicle = st.selectbox("Vehicle Option:", list(vehicle_labeled.keys()))
-    vehicle_key = vehicle_labeled[selected_vehicle]
-    annual_vehicle_payment = vehicle_data_raw[vehicle_key][0]
-    vehicle_mpg = vehicle_data_raw[vehicle_key][1]
+    selected_vehicle = st.selectbox("Vehicle Option:", options["vehicle"], key="vehicle")
 
-    # Gas cost inputs
-    if vehicle_key != "No Car (Public Transport)":
+    # Gas cost inputs (only if user has a car)
+    if data["vehicle"][selected_vehicle] != "No Car (Public Transport)":
         st.subheader("Annual Driving Information")
-        annual_miles = st.number_input("How many miles do you drive per year?", min_value=0, value=10000)
-        gas_price = st.number_input("Average gas price per gallon?", min_value=0.0, value=3.50, format="%.2f")
-        # Compute gas cost if user has a real vehicle
-        if vehicle_mpg > 0:
-            gallons_per_year = annual_miles / vehicle_mpg
-            annual_gas_cost = gallons_per_year * gas_price
-        else:
-            annual_gas_cost = 0
+        annual_miles = st.number_input("How many miles do you drive per year?", min_value=0, value=10000, key="annual_miles")
+        gas_price = st.number_input("Average gas price per gallon?", min_value=0.0, value=3.50, format="%.2f", key="gas_price")
     else:
         # No Car => no gas cost
         annual_miles = 0
         gas_price = 0
-        annual_gas_cost = 0
 
-    st.subheader("Select Your Groceries Budget")
-    selected_groceries = st.selectbox("Groceries:", list(groceries_data.keys()))
-    annual_groceries_cost = groceries_data[selected_groceries]
+    with st.form("choices"):
+        st.subheader("Select Your Career")
+        selected_career = st.selectbox("Career Path:", options["career"], key="career")
 
-    st.subheader("Select Your Medical Insurance")
-    selected_medical = st.selectbox("Medical Plan:", list(medical_data.keys()))
-    annual_medical_cost = medical_data[selected_medical]
+        st.subheader("Select Your Housing")
+        selected_housing = st.selectbox("Housing Option:", options["housing"], key="housing")
 
-    # If family => childcare
-    if family_status == "Family with kids":
-        st.subheader("Childcare / Daycare")
-        selected_childcare = st.selectbox("Childcare Option:", list(childcare_data.keys()))
-        annual_childcare_cost = childcare_data[selected_childcare]
-    else:
-        annual_childcare_cost = 0
+        st.subheader("Select Your Groceries Budget")
+        selected_groceries = st.selectbox("Groceries:", options["groceries"], key="groceries")
 
-    st.subheader("Select Your Phone Plan")
-    selected_phone = st.selectbox("Phone Plan:", list(phone_data.keys()))
-    annual_phone_cost = phone_data[selected_phone]
+        st.subheader("Select Your Medical Insurance")
+        selected_medical = st.selectbox("Medical Plan:", options["medical"], key="medical")
 
-    st.subheader("Select Your Utilities")
-    selected_utilities = st.selectbox("Utilities:", list(utilities_data.keys()))
-    annual_utilities_cost = utilities_data[selected_utilities]
+        # If family => childcare
+        if family_status == "Family with kids":
+            st.subheader("Childcare / Daycare")
+            selected_childcare = st.selectbox("Childcare Option:", options["childcare"], key="childcare")
+        else:
+            selected_childcare = None
 
-    st.subheader("Select Your College Loan Repayment")
-    selected_loan = st.selectbox("Loan Repayment:", list(loan_data.keys()))
-    annual_loan_cost = loan_data[selected_loan]
+        st.subheader("Select Your Phone Plan")
+        selected_phone = st.selectbox("Phone Plan:", options["phone"], key="phone")
 
-    st.subheader("Select Your Entertainment")
-    selected_entertainment = st.selectbox("Entertainment:", list(entertainment_data.keys()))
-    annual_entertainment_cost = entertainment_data[selected_entertainment]
+        st.subheader("Select Your Utilities")
+        selected_utilities = st.selectbox("Utilities:", options["utilities"], key="utilities")
 
-    st.subheader("Retirement Savings (as % of Salary)")
-    selected_retirement = st.selectbox("Contribution:", list(retirement_data.keys()))
-    retirement_fraction = retirement_data[selected_retirement]
-    annual_retirement_cost = annual_salary * retirement_fraction
+        st.subheader("Select Your College Loan Repayment")
+        selected_loan = st.selectbox("Loan Repayment:", options["loan"], key="loan")
+
+        st.subheader("Select Your Entertainment")
+        selected_entertainment = st.selectbox("Entertainment:", options["entertainment"], key="entertainment")
+
+        st.subheader("Retirement Savings (as % of Salary)")
+        selected_retirement = st.selectbox("Contribution:", options["retirement"], key="retirement")
+
+        submitted = st.form_submit_button("Calculate")
 
     ############################################################################
     # 6. Calculate Taxes & Discretionary Income
     ############################################################################
-    tax_amount = compute_taxes(annual_salary)
-
-    # Sum up all expenses
-    total_expenses = (
-        annual_housing_cost +
-        annual_home_insurance +  # mandatory home/renters insurance
-        annual_vehicle_payment +
-        annual_gas_cost +
-        annual_groceries_cost +
-        annual_medical_cost +
-        annual_childcare_cost +  # only > 0 if family
-        annual_phone_cost +
-        annual_utilities_cost +
-        annual_loan_cost +
-        annual_entertainment_cost +
-        annual_retirement_cost
-    )
-
-    discretionary_income = annual_salary - tax_amount - total_expenses
+    if submitted:
+        # Keep the submitted scenario, so later reruns (e.g. toggling family
+        # status) keep showing it until the user presses "Calculate" again.
+        st.session_state["last_result"] = compute_breakdown(
+            family_status,
+            selected_career,
+            selected_housing,
+            selected_vehicle,
+            annual_miles,
+            gas_price,
+            selected_groceries,
+            selected_medical,
+            selected_childcare,
+            selected_phone,
+            selected_utilities,
+            selected_loan,
+            selected_entertainment,
+            selected_retirement,
+        )
+    elif "last_result" not in st.session_state:
+        st.info("Make your selections above, then press **Calculate**.")
+        return
+
+    result = st.session_state["last_result"]
 
     ############################################################################
     # 7. Display Summary
     ############################################################################
-    st.write("---")
-    st.write("## Summary of Your Choices & Costs (Annual)")
-
-    st.write(f"- **Family Status**: {family_status}")
-    st.write(f"- **Career**: {selected_career} => **${annual_salary:,.0f}**")
-    st.write(f"- **Taxes**: **${tax_amount:,.0f}**")
-    st.write(f"- **Housing**: {selected_housing} => **${annual_housing_cost:,.0f}** + home insurance **${annual_home_insurance:,.0f}**")
-    st.write(f"- **Vehicle**: {selected_vehicle} => **${annual_vehicle_payment:,.0f}**")
-    if vehicle_key != "No Car (Public Transport)":
-        st.write(f"   - Annual Miles: **{annual_miles:,.0f}** at {vehicle_mpg} MPG, Gas = **${annual_gas_cost:,.0f}**")
-    st.write(f"- **Groceries**: {selected_groceries} => **${annual_groceries_cost:,.0f}**")
-    st.write(f"- **Medical**: {selected_medical} => **${annual_medical_cost:,.0f}**")
-
-    if family_status == "Family with kids":
-        st.write(f"- **Childcare**: => **${annual_childcare_cost:,.0f}**")
-    st.write(f"- **Phone**: {selected_phone} => **${annual_phone_cost:,.0f}**")
-    st.write(f"- **Utilities**: {selected_utilities} => **${annual_utilities_cost:,.0f}**")
-    st.write(f"- **College Loan**: {selected_loan} => **${annual_loan_cost:,.0f}**")
-    st.write(f"- **Entertainment**: {selected_entertainment} => **${annual_entertainment_cost:,.0f}**")
-    st.write(f"- **Retirement**: {selected_retirement} => **${annual_retirement_cost:,.0f}**")
+    # Built up as one markdown block and sent in a single call, instead of one
+    # st.write (and one frontend message) per line.
+    summary = [
+        "---",
+        "## Summary of Your Choices & Costs (Annual)",
+        f"- **Family Status**: {result['family_status']}",
+        f"- **Career**: {result['selected_career']} => **${result['annual_salary']:,.0f}**",
+        f"- **Taxes**: **${result['tax_amount']:,.0f}**",
+        f"- **Housing**: {result['selected_housing']} => **${result['annual_housing_cost']:,.0f}** + home insurance **${result['annual_home_insurance']:,.0f}**",
+        f"- **Vehicle**: {result['selected_vehicle']} => **${result['annual_vehicle_payment']:,.0f}**",
+    ]
+    if result["vehicle_key"] != "No Car (Public Transport)":
+        summary.append(f"   - Annual Miles: **{result['annual_miles']:,.0f}** at {result['vehicle_mpg']} MPG, Gas = **${result['annual_gas_cost']:,.0f}**")
+    summary.append(f"- **Groceries**: {result['selected_groceries']} => **${result['annual_groceries_cost']:,.0f}**")
+    summary.append(f"- **Medical**: {result['selected_medical']} => **${result['annual_medical_cost']:,.0f}**")
+
+    if result["family_status"] == "Family with kids":
+        summary.append(f"- **Childcare**: => **${result['annual_childcare_cost']:,.0f}**")
+    summary += [
+        f"- **Phone**: {result['selected_phone']} => **${result['annual_phone_cost']:,.0f}**",
+        f"- **Utilities**: {result['selected_utilities']} => **${result['annual_utilities_cost']:,.0f}**",
+        f"- **College Loan**: {result['selected_loan']} => **${result['annual_loan_cost']:,.0f}**",
+        f"- **Entertainment**: {result['selected_entertainment']} => **${result['annual_entertainment_cost']:,.0f}**",
+        f"- **Retirement**: {result['selected_retirement']} => **${result['annual_retirement_cost']:,.0f}**",
+    ]
+    st.markdown("\n".join(summary))
 
+    discretionary_income = result["discretionary_income"]
     if discretionary_income < 0:
         st.error(f"**Discretionary Income: -${abs(discretionary_income):,.0f}**")
     else:
@@ -365,83 +606,18 @@ def main():
     ############################################################################
     # 8. Waterfall Chart WITHOUT Double Counting
     ############################################################################
-    # We'll give the final "Discretionary Income" step an Amount=0, 
-    # but label the bar with the leftover.
-
-    data_steps = [
-        {"Category": "Starting Salary",       "Amount": annual_salary},
-        {"Category": "Taxes",                 "Amount": -tax_amount},
-        {"Category": "Housing",               "Amount": -annual_housing_cost},
-        {"Category": "Home Insurance",        "Amount": -annual_home_insurance},
-        {"Category": "Vehicle Payment",       "Amount": -annual_vehicle_payment},
-        {"Category": "Gas",                   "Amount": -annual_gas_cost},
-        {"Category": "Groceries",             "Amount": -annual_groceries_cost},
-        {"Category": "Medical Insurance",     "Amount": -annual_medical_cost},
-        {"Category": "Childcare",             "Amount": -annual_childcare_cost},
-        {"Category": "Phone Plan",            "Amount": -annual_phone_cost},
-        {"Category": "Utilities",             "Amount": -annual_utilities_cost},
-        {"Category": "College Loan",          "Amount": -annual_loan_cost},
-        {"Category": "Entertainment",         "Amount": -annual_entertainment_cost},
-        {"Category": "Retirement",            "Amount": -annual_retirement_cost},
-        {"Category": "Discretionary Income",  "Amount": 0},
-    ]
-
-    df_steps = pd.DataFrame(data_steps)
-    df_steps["Cumulative"] = df_steps["Amount"].cumsum()
-    df_steps["Start"] = df_steps["Cumulative"].shift(1, fill_value=0)
-    df_steps["End"] = df_steps["Cumulative"]
-
-    # Custom label that shows the leftover on the final bar
-    def get_label(row):
-        if row["Category"] == "Discretionary Income":
-            return discretionary_income
-        else:
-            return row["Cumulative"]
-
-    df_steps["Label"] = df_steps.apply(get_label, axis=1)
-
-    def pick_color(cat):
-        if cat == "Starting Salary":
-            return "green"
-        elif cat == "Discretionary Income":
-            return "blue" if discretionary_income >= 0 else "red"
-        else:
-            return "red"
-
-    df_steps["Color"] = df_steps["Category"].apply(pick_color)
-
-    base = alt.Chart(df_steps)
-
-    bars = base.mark_bar().encode(
-        x=alt.X("Category:N", sort=None, title=""),
-        y=alt.Y("Start:Q", title="Annual Amount (USD)"),
-        y2="End:Q",
-        color=alt.Color("Color:N", scale=None),
-        tooltip=[
-            alt.Tooltip("Category:N",    title="Category"),
-            alt.Tooltip("Amount:Q",      title="Step Amount", format=",.0f"),
-            alt.Tooltip("Cumulative:Q",  title="Cumulative",  format=",.0f")
-        ]
-    )
-
-    labels = base.mark_text(
-        dy=-5,
-        color="black",
-        fontWeight="bold"
-    ).encode(
-        x=alt.X("Category:N", sort=None),
-        y=alt.Y("End:Q"),
-        text=alt.Text("Label:Q", format=",.0f")
-    )
-
-    waterfall_chart = (bars + labels).properties(
-        width=800,
-        height=400
-    )
+    # Rebuild the rows only when the chart inputs change; otherwise the spec
+    # kept in session state is drawn again as-is. The stable key lets
+    # Streamlit keep the same chart element across reruns.
+    waterfall_sig = (result["amounts"], discretionary_income)
+    if st.session_state.get("waterfall_sig") != waterfall_sig:
+        waterfall_rows = build_waterfall_rows(*waterfall_sig)
+        st.session_state["waterfall_spec"] = {**_WATERFALL_SPEC, "data": {"values": waterfall_rows}}
+        st.session_state["waterfall_sig"] = waterfall_sig
 
     st.write("---")
     st.write("## Waterfall Chart: Income to Discretionary Breakdown")
-    st.altair_chart(waterfall_chart, use_container_width=True)
+    st.vega_lite_chart(st.session_state["waterfall_spec"], use_container_width=True, key="waterfall")
 
 if __name__ == "__main__":
     main()